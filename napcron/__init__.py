@@ -31,17 +31,31 @@ When no config path is provided, ~/.napcron.yaml is used and created automatical
 from __future__ import annotations
 
 import argparse
-import concurrent.futures as cf
+import errno
 import hashlib
 import json
 import os
+import select
+import shlex
+import signal
 import socket
 import subprocess
 import sys
+import threading
 import time
-from pprint import pprint
 from datetime import datetime, timedelta, timezone
-from typing import Dict, List, Tuple, Optional, Union
+from typing import Dict, Iterator, List, Tuple, Optional, Union
+
+try:
+    import orjson  # optional: faster state (de)serialization
+except ImportError:
+    orjson = None
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
 
 # ------------------------- Frequencies -------------------------
 FREQS: Dict[str, timedelta] = {
@@ -51,6 +65,8 @@ FREQS: Dict[str, timedelta] = {
     "monthly": timedelta(days=30),  # anacron-like cadence
 }
 
+_FREQ_SECS: Dict[str, float] = {freq: interval.total_seconds() for freq, interval in FREQS.items()}
+
 DEFAULT_CONFIG_BASENAME = ".napcron.yaml"
 DEFAULT_CONFIG_TEMPLATE = "daily:\n"
 
@@ -87,56 +103,152 @@ def parse_iso(s: Optional[str]) -> Optional[datetime]:
     except Exception:
         return None
 
-def is_due(last_success_iso: Optional[str], freq: str) -> bool:
-    """True if enough time elapsed since last_success for this frequency."""
-    interval = FREQS[freq]
-    if not last_success_iso:
-        return True
-    last = parse_iso(last_success_iso)
-    if not last:
+def iso_to_ts(s: Optional[str]) -> Optional[float]:
+    dt = parse_iso(s)
+    return dt.timestamp() if dt else None
+
+def is_due(last_success_ts: Optional[float], freq: str, now: Optional[float] = None) -> bool:
+    """True if enough time elapsed since last_success (epoch seconds) for this frequency."""
+    if last_success_ts is None:
         return True
-    return (now_utc() - last) >= interval
+    if now is None:
+        now = now_utc().timestamp()
+    return now - last_success_ts >= _FREQ_SECS[freq]
+
+def due_cutoffs(now: float) -> Dict[str, float]:
+    """Per-frequency epoch cutoff: a task whose reference time is <= cutoff is due."""
+    return {freq: now - secs for freq, secs in _FREQ_SECS.items()}
 
 # ------------------------- Requirements ------------------------
-def req_internet(_: str) -> bool:
+INTERNET_TARGETS: List[Tuple[str, int]] = [("1.1.1.1", 443), ("8.8.8.8", 53)]
+_CONNECT_IN_PROGRESS = {errno.EINPROGRESS, errno.EWOULDBLOCK, getattr(errno, "WSAEWOULDBLOCK", errno.EWOULDBLOCK)}
+
+def req_internet(_: str, timeout: float = 2.0) -> bool:
     """True if at least one quick TCP connect succeeds (robust to DNS/firewall quirks)."""
-    targets = [("1.1.1.1", 443), ("8.8.8.8", 53)]
-    for host, port in targets:
-        try:
-            with socket.create_connection((host, port), timeout=2):
+    socks: List[socket.socket] = []
+    try:
+        # Start non-blocking connects to every target and wait for them together.
+        pending: List[socket.socket] = []
+        for host, port in INTERNET_TARGETS:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            socks.append(sock)
+            sock.setblocking(False)
+            rc = sock.connect_ex((host, port))
+            if rc == 0:
                 return True
-        except OSError:
-            continue
-    return False
+            if rc in _CONNECT_IN_PROGRESS:
+                pending.append(sock)
+
+        deadline = time.monotonic() + timeout
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            _, writable, errored = select.select([], pending, pending, remaining)
+            for sock in set(writable) | set(errored):
+                if sock in writable and sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR) == 0:
+                    return True
+                pending.remove(sock)
+        return False
+    except OSError:
+        return False
+    finally:
+        for sock in socks:
+            sock.close()
 
-def _linux_ac_online() -> Optional[bool]:
-    base = "/sys/class/power_supply"
-    if not os.path.isdir(base):
+POWER_SUPPLY_DIR = "/sys/class/power_supply"
+
+# "online" file of the first Mains supply, remembered once discovered.
+_AC_MAINS_ONLINE_PATH: Optional[str] = None
+
+def _read_sysfs(path: str) -> Optional[str]:
+    # sysfs attributes are a few bytes: one raw read, no buffered file objects
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
         return None
     try:
-        # Prefer type=Mains + online
-        for name in os.listdir(base):
-            tfile = os.path.join(base, name, "type")
-            ofile = os.path.join(base, name, "online")
-            if os.path.isfile(tfile):
-                with open(tfile, "r", encoding="utf-8", errors="ignore") as f:
-                    typ = f.read().strip().lower()
-                if typ == "mains" and os.path.isfile(ofile):
-                    with open(ofile, "r", encoding="utf-8", errors="ignore") as f:
-                        return f.read().strip() == "1"
-        # Fallback: charging/full battery → likely on external power
-        for name in os.listdir(base):
-            sfile = os.path.join(base, name, "status")
-            if os.path.isfile(sfile):
-                with open(sfile, "r", encoding="utf-8", errors="ignore") as f:
-                    status = f.read().strip().lower()
-                if status in ("charging", "full"):
-                    return True
+        return os.read(fd, 64).decode("ascii", "ignore").strip().lower()
+    except OSError:
         return None
+    finally:
+        os.close(fd)
+
+def _linux_ac_online() -> Optional[bool]:
+    global _AC_MAINS_ONLINE_PATH
+    try:
+        if _AC_MAINS_ONLINE_PATH:
+            online = _read_sysfs(_AC_MAINS_ONLINE_PATH)
+            if online is not None:
+                return online == "1"
+            _AC_MAINS_ONLINE_PATH = None  # supply went away; rescan
+        # Single pass: prefer type=Mains + online, else remember whether any
+        # battery is charging/full (→ likely on external power).
+        charging = False
+        with os.scandir(POWER_SUPPLY_DIR) as it:
+            for entry in it:
+                if _read_sysfs(entry.path + "/type") == "mains":
+                    online = _read_sysfs(entry.path + "/online")
+                    if online is not None:
+                        _AC_MAINS_ONLINE_PATH = entry.path + "/online"
+                        return online == "1"
+                elif not charging:
+                    charging = _read_sysfs(entry.path + "/status") in ("charging", "full")
+        return True if charging else None
     except Exception:
         return None
 
+# (IOKit, CoreFoundation) handles, loaded on first use.
+_MACOS_FRAMEWORKS = None
+_kCFStringEncodingUTF8 = 0x08000100
+
+def _macos_frameworks():
+    global _MACOS_FRAMEWORKS
+    if _MACOS_FRAMEWORKS is None:
+        import ctypes
+        iokit = ctypes.CDLL("/System/Library/Frameworks/IOKit.framework/IOKit")
+        corefoundation = ctypes.CDLL("/System/Library/Frameworks/CoreFoundation.framework/CoreFoundation")
+        iokit.IOPSCopyPowerSourcesInfo.argtypes = []
+        iokit.IOPSCopyPowerSourcesInfo.restype = ctypes.c_void_p
+        iokit.IOPSGetProvidingPowerSourceType.argtypes = [ctypes.c_void_p]
+        iokit.IOPSGetProvidingPowerSourceType.restype = ctypes.c_void_p
+        corefoundation.CFStringGetCString.argtypes = [ctypes.c_void_p, ctypes.c_char_p, ctypes.c_long, ctypes.c_uint32]
+        corefoundation.CFStringGetCString.restype = ctypes.c_bool
+        corefoundation.CFRelease.argtypes = [ctypes.c_void_p]
+        corefoundation.CFRelease.restype = None
+        _MACOS_FRAMEWORKS = (iokit, corefoundation)
+    return _MACOS_FRAMEWORKS
+
+def _macos_power_source_type() -> Optional[str]:
+    """Providing power source as reported by IOKit ("AC Power", "Battery Power", ...)."""
+    import ctypes
+    iokit, corefoundation = _macos_frameworks()
+    info = iokit.IOPSCopyPowerSourcesInfo()
+    if not info:
+        return None
+    try:
+        source = iokit.IOPSGetProvidingPowerSourceType(info)  # not owned: no release
+        if not source:
+            return None
+        buf = ctypes.create_string_buffer(64)
+        if not corefoundation.CFStringGetCString(source, buf, len(buf), _kCFStringEncodingUTF8):
+            return None
+        return buf.value.decode("utf-8")
+    finally:
+        corefoundation.CFRelease(info)
+
 def _macos_ac_online() -> Optional[bool]:
+    try:
+        source = _macos_power_source_type()
+    except Exception:
+        source = None
+    if source == "AC Power":
+        return True
+    if source == "Battery Power":
+        return False
+    if source is not None:
+        return None  # e.g. "UPS Power"
+    # IOKit unavailable: fall back to asking pmset
     try:
         out = subprocess.check_output(["pmset", "-g", "batt"], text=True, timeout=3, stderr=subprocess.DEVNULL)
         first = out.splitlines()[0].lower()
@@ -170,8 +282,18 @@ def _windows_ac_online() -> Optional[bool]:
     except Exception:
         return None
 
+# Platform probe result shared by ac_power/battery checks; main() clears it for each run.
+_AC_CACHE: Dict[str, Optional[bool]] = {}
+_AC_CACHE_LOCK = threading.Lock()
+
 def _ac_power_status() -> Optional[bool]:
     """Best-effort detection of AC power. Returns True, False or None if unknown."""
+    with _AC_CACHE_LOCK:  # requirement checks run concurrently; probe only once
+        if "status" not in _AC_CACHE:
+            _AC_CACHE["status"] = _probe_ac_power()
+        return _AC_CACHE["status"]
+
+def _probe_ac_power() -> Optional[bool]:
     if sys.platform.startswith("linux"):
         return _linux_ac_online()
     elif sys.platform == "darwin":
@@ -197,15 +319,74 @@ REQUIREMENTS = {
     "battery": req_battery,
 }
 
+def _check_requirement(name: str, cmd: str) -> bool:
+    fn = REQUIREMENTS.get(name)
+    if not fn:
+        return False
+    try:
+        return bool(fn(cmd))
+    except Exception:
+        return False
+
+# Upper bound on the wall time spent evaluating all requirements of a run.
+REQUIREMENTS_TIMEOUT = 10.0
+
+def check_requirements(needed: Dict[str, str], timeout: float = REQUIREMENTS_TIMEOUT) -> Dict[str, bool]:
+    """
+    Evaluate each requirement once, concurrently. `needed` maps a requirement name to the
+    command passed to its check. Unknown names, checks that raise, and checks still running
+    after `timeout` seconds count as unmet; they are left running on daemon threads so they
+    cannot hold up the process at exit.
+    """
+    if not needed:
+        return {}
+    results: Dict[str, bool] = {}
+
+    def probe(name: str, cmd: str) -> None:
+        results[name] = _check_requirement(name, cmd)
+
+    # Daemon threads: a hung check must not keep the process alive once napcron is done.
+    threads = [
+        threading.Thread(target=probe, args=(name, cmd), name=f"napcron-req-{name}", daemon=True)
+        for name, cmd in needed.items()
+    ]
+    for t in threads:
+        t.start()
+    deadline = time.monotonic() + timeout
+    for t in threads:
+        t.join(max(0.0, deadline - time.monotonic()))
+    return {name: results.get(name, False) for name in needed}
+
 # Requirement-like flags that toggle behavior but should not be treated as predicates.
 SPECIAL_REQUIREMENT_FLAGS = {
     "rerun_onfail",  # opt-in to legacy "retry failed tasks immediately" logic
 }
 
 # ------------------------- YAML parsing ------------------------
-def load_yaml(path: str) -> Dict[str, List[Dict[str, List[str]]]]:
+def _warn(msg: str, warnings: Optional[List[str]]) -> None:
+    print(msg, file=sys.stderr)
+    if warnings is not None:
+        warnings.append(msg)
+
+def _check_known_requirement(req: str, path: str, reported: set) -> None:
+    """Warn (once per name in `reported`) about a requirement no check or flag handles."""
+    if req in REQUIREMENTS or req in SPECIAL_REQUIREMENT_FLAGS or req in reported:
+        return
+    reported.add(req)
+    print(f"WARNING: unknown requirement '{req}' in {path}; tasks listing it will not run.", file=sys.stderr)
+
+def _first_occurrence(seen: set, freq: str, cmd: str, path: str, warnings: Optional[List[str]]) -> bool:
+    if (freq, cmd) in seen:
+        _warn(f"WARNING: ignoring duplicate task '{cmd}' under '{freq}' in {path}.", warnings)
+        return False
+    seen.add((freq, cmd))
+    return True
+
+def iter_jobs(path: str, warnings: Optional[List[str]] = None) -> Iterator[Tuple[str, str, List[str]]]:
     """
-    Normalize YAML into: { 'daily': [ {'cmd': str, 'requires': [str,...]} ], ... }
+    Yield normalized jobs from the YAML config as (freq, cmd, [requirement, ...]).
+    Warnings are printed to stderr and, if given, also appended to `warnings` (except
+    unknown-requirement ones, which depend on what is registered in REQUIREMENTS).
 
     Accepted job forms:
       - "cmd"               → no requirements
@@ -219,26 +400,25 @@ def load_yaml(path: str) -> Dict[str, List[Dict[str, List[str]]]]:
         print("ERROR: PyYAML is required. Install with: pip install pyyaml", file=sys.stderr)
         sys.exit(2)
 
+    # LibYAML's C loader when PyYAML was built with it; same safe semantics either way
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
     with open(path, "r", encoding="utf-8") as f:
-        data = yaml.safe_load(f) or {}
+        data = yaml.load(f, Loader=loader) or {}
 
-    normalized: Dict[str, List[Dict[str, List[str]]]] = {}
+    seen = set()  # (freq, cmd): duplicates are dropped here, before any due/requirement work
+    unknown_reqs = set()
     for key, val in (data or {}).items():
         freq = str(key).lower()
         if freq not in FREQS:
-            print(
+            _warn(
                 f"WARNING: ignoring unsupported frequency '{key}' in {path}. "
                 f"Supported: {', '.join(sorted(FREQS))}",
-                file=sys.stderr,
+                warnings,
             )
             continue
         if not isinstance(val, list):
-            print(
-                f"WARNING: ignoring jobs under '{key}' in {path}: expected a list.",
-                file=sys.stderr,
-            )
+            _warn(f"WARNING: ignoring jobs under '{key}' in {path}: expected a list.", warnings)
             continue
-        jobs: List[Dict[str, List[str]]] = []
         for item in val:
             if isinstance(item, dict):
                 # single-key mapping: { "cmd": <None | str | list> }
@@ -252,10 +432,19 @@ def load_yaml(path: str) -> Dict[str, List[Dict[str, List[str]]]]:
                         req_list = [str(r).lower() for r in reqs]
                     else:
                         continue  # bad shape
-                    jobs.append({"cmd": cmd_str, "requires": req_list})
+                    for r in req_list:
+                        _check_known_requirement(r, path, unknown_reqs)
+                    if _first_occurrence(seen, freq, cmd_str, path, warnings):
+                        yield (freq, cmd_str, req_list)
             elif isinstance(item, str):
-                jobs.append({"cmd": item, "requires": []})  # short form
-        normalized[freq] = jobs
+                if _first_occurrence(seen, freq, item, path, warnings):
+                    yield (freq, item, [])  # short form
+
+def load_yaml(path: str) -> Dict[str, List[Dict[str, List[str]]]]:
+    """Normalize YAML into: { 'daily': [ {'cmd': str, 'requires': [str,...]} ], ... }"""
+    normalized: Dict[str, List[Dict[str, List[str]]]] = {}
+    for freq, cmd, req_list in iter_jobs(path):
+        normalized.setdefault(freq, []).append({"cmd": cmd, "requires": req_list})
     return normalized
 
 # ------------------------- State I/O ---------------------------
@@ -266,67 +455,293 @@ def default_state_path(config_path: str) -> str:
     os.makedirs(state_dir, exist_ok=True)
     return os.path.join(state_dir, f"{base}_{hash_suffix}.state.json")
 
+def _is_epoch(value: object) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+class TaskEntry:
+    """
+    Per-task state record. Stored as a plain dict only in the JSON state file.
+
+    last_success/last_attempt are ISO strings for humans; the *_ts twins hold the same
+    instants as epoch seconds and are what due-checks compare against. Keys this version
+    doesn't know (hand-added notes, fields from a newer napcron) are kept in `extra` and
+    written back unchanged.
+    """
+
+    FIELDS = (
+        "frequency", "cmd", "last_success", "last_attempt", "last_status", "last_note",
+        "last_success_ts", "last_attempt_ts",
+    )
+    __slots__ = FIELDS + ("extra",)
+
+    def __init__(
+        self,
+        frequency: str,
+        cmd: str,
+        last_success: Optional[str] = None,
+        last_attempt: Optional[str] = None,
+        last_status: Union[int, str, None] = None,
+        last_note: Optional[str] = None,
+        last_success_ts: Optional[float] = None,
+        last_attempt_ts: Optional[float] = None,
+    ) -> None:
+        self.frequency = frequency
+        self.cmd = cmd
+        self.last_success = last_success
+        self.last_attempt = last_attempt
+        self.last_status = last_status
+        self.last_note = last_note
+        self.last_success_ts = last_success_ts
+        self.last_attempt_ts = last_attempt_ts
+        self.extra: Dict = {}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "TaskEntry":
+        entry = cls(**{name: data.get(name) for name in cls.FIELDS})
+        entry.extra = {k: v for k, v in data.items() if k not in cls.FIELDS}
+        # Re-derive missing (entries written before timestamps were stored) or corrupt timestamps
+        if not _is_epoch(entry.last_success_ts):
+            entry.last_success_ts = iso_to_ts(entry.last_success)
+        if not _is_epoch(entry.last_attempt_ts):
+            entry.last_attempt_ts = iso_to_ts(entry.last_attempt)
+        return entry
+
+    def to_dict(self) -> Dict:
+        data = dict(self.extra)
+        data.update((name, getattr(self, name)) for name in self.FIELDS)
+        return data
+
+    def __repr__(self) -> str:
+        return f"TaskEntry({self.to_dict()!r})"
+
+def _state_default(obj):
+    if isinstance(obj, TaskEntry):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def _dumps_state(state: Dict) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(state, default=_state_default, option=orjson.OPT_SORT_KEYS | orjson.OPT_INDENT_2)
+    return json.dumps(state, indent=2, sort_keys=True, default=_state_default).encode("utf-8")
+
+def _loads_state(data: bytes) -> Dict:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
 def load_state(path: str) -> Dict:
     if not os.path.exists(path):
         return {"tasks": {}}
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
+        with open(path, "rb") as f:
+            state = _loads_state(f.read())
+        tasks = state.get("tasks") or {}
+        state["tasks"] = {tid: TaskEntry.from_dict(e) for tid, e in tasks.items() if isinstance(e, dict)}
+        return state
     except Exception:
         return {"tasks": {}}
 
 def save_state(path: str, state: Dict) -> None:
     tmp = f"{path}.tmp"
-    with open(tmp, "w", encoding="utf-8") as f:
-        json.dump(state, f, indent=2, sort_keys=True)
+    with open(tmp, "wb") as f:
+        f.write(_dumps_state(state))
+        f.flush()
+        os.fsync(f.fileno())
     os.replace(tmp, path)
+    # Persist the rename itself (POSIX only; Windows can't open directories)
+    if hasattr(os, "O_DIRECTORY"):
+        dfd = os.open(os.path.dirname(path) or ".", os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dfd)
+        finally:
+            os.close(dfd)
 
-# ------------------------- Locking (atomic) -------------------
-def acquire_lock(state_path: str) -> Optional[str]:
-    """Atomic lock via O_EXCL. Locks older than 2h are considered stale and replaced."""
-    lock_path = state_path + ".lock"
+# Normalized jobs of the last parsed config, kept in the state file under this key.
+CONFIG_CACHE_KEY = "_config_cache"
+_CONFIG_CACHE_VERSION = 3
 
-    def _try_create() -> bool:
-        try:
-            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
-            with os.fdopen(fd, "w") as f:
-                f.write(str(os.getpid()))
-            return True
-        except FileExistsError:
-            return False
+def _cached_jobs(cached: object, stamp: List) -> Optional[Tuple[List[Tuple[str, str, List[str]]], List[str]]]:
+    """(jobs, warnings) from a cache entry matching stamp, or None if it is stale or malformed."""
+    if not isinstance(cached, dict) or cached.get("key") != stamp:
+        return None
+    try:
+        jobs = []
+        for freq, cmd, reqs in cached["jobs"]:
+            if freq not in FREQS or not isinstance(cmd, str) or not isinstance(reqs, list):
+                return None
+            jobs.append((freq, cmd, [str(r) for r in reqs]))
+        warnings = cached.get("warnings", [])
+        if not isinstance(warnings, list):
+            return None
+        return jobs, [str(w) for w in warnings]
+    except (KeyError, TypeError, ValueError):
+        return None
 
-    if _try_create():
-        return lock_path
+def load_jobs(cfg_path: str, state: Dict) -> Tuple[List[Tuple[str, str, List[str]]], bool]:
+    """
+    Normalized jobs for cfg_path. Reuses state[CONFIG_CACHE_KEY] while the file's
+    (path, mtime_ns, size) is unchanged, re-printing the warnings recorded when it was parsed
+    and re-checking requirement names against the current REQUIREMENTS; otherwise (or if the
+    entry is malformed) parses it and refreshes the cache.
+    Returns (jobs, cache_updated).
+    """
+    st = os.stat(cfg_path)
+    stamp = [_CONFIG_CACHE_VERSION, cfg_path, st.st_mtime_ns, st.st_size]
+    hit = _cached_jobs(state.get(CONFIG_CACHE_KEY), stamp)
+    if hit is not None:
+        jobs, warnings = hit
+        for msg in warnings:
+            print(msg, file=sys.stderr)
+        unknown_reqs: set = set()
+        for _, _, reqs in jobs:
+            for r in reqs:
+                _check_known_requirement(r, cfg_path, unknown_reqs)
+        return jobs, False
+    warnings = []
+    jobs = list(iter_jobs(cfg_path, warnings))
+    state[CONFIG_CACHE_KEY] = {"key": stamp, "jobs": jobs, "warnings": warnings}
+    return jobs, True
+
+# ------------------------- Locking (advisory) ----------------
+def acquire_lock(state_path: str) -> Optional[int]:
+    """
+    Exclusive, non-blocking OS lock on <state>.lock. Returns the open fd, or None if another
+    instance holds the lock. The OS releases it when the process exits, so no stale locks.
+    """
+    lock_path = state_path + ".lock"
+    fd = os.open(lock_path, os.O_CREAT | os.O_RDWR, 0o644)
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+    except OSError:
+        os.close(fd)
+        return None
 
     try:
-        age = time.time() - os.path.getmtime(lock_path)
-        if age >= 2 * 3600:
-            os.remove(lock_path)
-            if _try_create():
-                return lock_path
-    except Exception:
+        os.ftruncate(fd, 0)
+        os.write(fd, str(os.getpid()).encode("ascii"))  # informational only
+    except OSError:
         pass
+    return fd
 
-    return None
-
-def release_lock(lock_path: Optional[str]) -> None:
-    if lock_path and os.path.exists(lock_path):
-        try:
-            os.remove(lock_path)
-        except Exception:
-            pass
+def release_lock(lock_fd: Optional[int]) -> None:
+    if lock_fd is None:
+        return
+    try:
+        if fcntl is None:
+            os.lseek(lock_fd, 0, os.SEEK_SET)
+            msvcrt.locking(lock_fd, msvcrt.LK_UNLCK, 1)
+    except OSError:
+        pass
+    try:
+        os.close(lock_fd)  # closing the fd drops the flock
+    except OSError:
+        pass
 
 # ------------------------- Execution --------------------------
-def run_command(cmd: str, verbose: bool, dry_run: bool) -> int:
+# (task_id, rc or "?" when launched detached, started, finished, rerun_onfail, note)
+JobResult = Tuple[str, Union[int, str], datetime, Optional[datetime], bool, Optional[str]]
+
+# Characters that need /bin/sh to interpret; commands without any of them are exec'd directly.
+_SHELL_CHARS = frozenset(";|&<>$`*?()[]{}~#=!\\\"'\n")
+
+def _split_command(cmd: str) -> Optional[List[str]]:
+    """argv for commands that need no shell features, else None."""
+    if any(c in _SHELL_CHARS for c in cmd):
+        return None
+    return shlex.split(cmd) or None
+
+def _announce(cmd: str, verbose: bool, dry_run: bool) -> None:
     ts = datetime.now().isoformat(timespec="seconds")
     if verbose or dry_run:
         print(f"[{ts}] RUN: {cmd}{' (dry-run)' if dry_run else ''}")
+
+# Where the open fds are listed; without one, the inherited fds can't be closed, so use subprocess.
+_FD_DIR = next((d for d in ("/proc/self/fd", "/dev/fd") if os.path.isdir(d)), None)
+_USE_POSIX_SPAWN = hasattr(os, "posix_spawnp") and _FD_DIR is not None
+
+# Signals Python ignores for itself; subprocess restores their defaults in the child, so do we.
+_SPAWN_SIGDEF = tuple(getattr(signal, n) for n in ("SIGPIPE", "SIGXFSZ") if hasattr(signal, n))
+
+def _inheritable_fds() -> List[int]:
+    """Inheritable fds >= 3 (e.g. passed in by cron or a wrapper), which subprocess would close."""
+    fds = []
+    for name in os.listdir(_FD_DIR):
+        fd = int(name)
+        if fd < 3:
+            continue
+        try:
+            if os.get_inheritable(fd):
+                fds.append(fd)
+        except OSError:
+            pass  # the fd listdir used, already closed
+    return fds
+
+def _posix_spawn(argv: List[str], verbose: bool) -> int:
+    """Start argv via posix_spawnp (no copy of the interpreter's page tables); returns the pid."""
+    file_actions = [(os.POSIX_SPAWN_CLOSE, fd) for fd in _inheritable_fds()]
+    if not verbose:
+        file_actions += [
+            (os.POSIX_SPAWN_OPEN, 1, os.devnull, os.O_WRONLY, 0),
+            (os.POSIX_SPAWN_OPEN, 2, os.devnull, os.O_WRONLY, 0),
+        ]
+    return os.posix_spawnp(
+        argv[0], argv, os.environ, file_actions=file_actions, setsigdef=_SPAWN_SIGDEF, setsigmask=()
+    )
+
+def _wait_exitcode(pid: int) -> int:
+    try:
+        _, status = os.waitpid(pid, 0)
+    except ChildProcessError:
+        # SIGCHLD is ignored, so the kernel already reaped the child; like subprocess, report 0.
+        return 0
+    return os.waitstatus_to_exitcode(status)
+
+def run_command(cmd: str, verbose: bool, dry_run: bool) -> int:
+    _announce(cmd, verbose, dry_run)
     if dry_run:
         return 0
     stdout = None if verbose else subprocess.DEVNULL
     stderr = None if verbose else subprocess.DEVNULL
+    argv = _split_command(cmd)
+    if argv is not None:
+        # Only a failure to start argv falls back to the shell; once it ran, never run it again.
+        if _USE_POSIX_SPAWN:
+            try:
+                pid = _posix_spawn(argv, verbose)
+            except OSError:
+                pass  # not an executable (e.g. a shell builtin): let the shell handle it
+            else:
+                return _wait_exitcode(pid)
+        else:
+            try:
+                return subprocess.run(argv, shell=False, stdout=stdout, stderr=stderr).returncode
+            except OSError:
+                pass  # not an executable (e.g. a shell builtin): let the shell handle it
     return subprocess.run(cmd, shell=True, stdout=stdout, stderr=stderr).returncode
 
+async def run_command_async(cmd: str, verbose: bool, dry_run: bool) -> int:
+    """Like run_command, but waits for the child on the event loop instead of a thread."""
+    import asyncio
+
+    _announce(cmd, verbose, dry_run)
+    if dry_run:
+        return 0
+    stdout = None if verbose else asyncio.subprocess.DEVNULL
+    stderr = None if verbose else asyncio.subprocess.DEVNULL
+    argv = _split_command(cmd)
+    if argv is not None:
+        try:
+            proc = await asyncio.create_subprocess_exec(*argv, stdout=stdout, stderr=stderr)
+            return await proc.wait()
+        except OSError:
+            pass  # not an executable (e.g. a shell builtin): let the shell handle it
+    proc = await asyncio.create_subprocess_shell(cmd, stdout=stdout, stderr=stderr)
+    return await proc.wait()
+
 # ------------------------- Main --------------------------------
 def main() -> None:
     default_cfg = default_config_path()
@@ -351,150 +766,181 @@ def main() -> None:
     state_parent = os.path.dirname(state_path)
     if state_parent and not os.path.isdir(state_parent):
         os.makedirs(state_parent, exist_ok=True)
-    lock_path = acquire_lock(state_path)
-    if lock_path is None:
+    lock_fd = acquire_lock(state_path)
+    if lock_fd is None:
         if args.verbose:
             print("Another instance appears to be running. Exiting.")
         sys.exit(0)
 
     try:
-        config = load_yaml(cfg_path)
+        state_dirty = not os.path.exists(state_path)  # first run always writes the state file
         state = load_state(state_path)
 
         if args.verbose:
             print(f"Loading state from {state_path}")
-            pprint(state)
-
-        tasks_state: Dict[str, Dict] = state.setdefault("tasks", {})
-
-        # Build list of due tasks (dedup by task_id = "freq::cmd")
+            from pprint import pprint
+            pprint({k: v for k, v in state.items() if k != CONFIG_CACHE_KEY})
+
+        tasks_state: Dict[str, TaskEntry] = state.setdefault("tasks", {})
+        jobs, cache_updated = load_jobs(cfg_path, state)
+        state_dirty = state_dirty or cache_updated
+
+        # First pass: find due tasks and the requirements they reference
+        candidates: List[Tuple[str, str, List[str], bool]] = []  # (task_id, cmd, reqs, rerun_onfail)
+        needed: Dict[str, str] = {}  # requirement name -> cmd of the first due task listing it
+        _AC_CACHE.clear()
+        cutoffs = due_cutoffs(now_utc().timestamp())  # one clock read for every due-check in this run
+
+        special = SPECIAL_REQUIREMENT_FLAGS
+        for freq, cmd, reqs_all in jobs:
+            # Split flags from predicates in one pass
+            reqs: List[str] = []
+            rerun_onfail = False
+            for r in reqs_all:
+                if r not in special:
+                    reqs.append(r)
+                elif r == "rerun_onfail":
+                    rerun_onfail = True
+            task_id = f"{freq}::{cmd}"
+
+            entry = tasks_state.get(task_id)
+            if entry is None:
+                entry = tasks_state[task_id] = TaskEntry(freq, cmd)
+                state_dirty = True
+            if entry.frequency != freq or entry.cmd != cmd:
+                entry.frequency = freq
+                entry.cmd = cmd
+                state_dirty = True
+
+            ref_ts = entry.last_success_ts
+            if not rerun_onfail and entry.last_status not in (None, 0):
+                ref_ts = entry.last_attempt_ts if entry.last_attempt_ts is not None else entry.last_success_ts
+
+            if ref_ts is not None and ref_ts > cutoffs[freq]:
+                if args.verbose:
+                    print(f"SKIP (not due): [{freq}] {cmd}")
+                continue
+
+            for r in reqs:
+                if r in REQUIREMENTS:  # unknown names were reported by iter_jobs and stay unmet
+                    needed.setdefault(r, cmd)
+            candidates.append((task_id, cmd, reqs, rerun_onfail))
+
+        # Evaluate every referenced requirement exactly once
+        req_results = check_requirements(needed)
+
+        # Second pass: build list of runnable tasks (iter_jobs already dropped duplicate task_ids)
         due: List[Tuple[str, str, bool]] = []  # (task_id, cmd, rerun_onfail)
-        seen = set()
-
-        for freq, jobs in config.items():
-            for job in jobs:
-                cmd = job["cmd"]
-                reqs_all = job.get("requires", []) or []
-                flags = {r for r in reqs_all if r in SPECIAL_REQUIREMENT_FLAGS}
-                reqs = [r for r in reqs_all if r not in SPECIAL_REQUIREMENT_FLAGS]
-                rerun_onfail = "rerun_onfail" in flags
-                task_id = f"{freq}::{cmd}"
-
-                entry = tasks_state.setdefault(task_id, {
-                    "frequency": freq,
-                    "cmd": cmd,
-                    "last_success": None,
-                    "last_attempt": None,
-                    "last_status": None,
-                    "last_note": None,
-                })
-                entry["frequency"] = freq
-                entry["cmd"] = cmd
-
-                last_success_iso = entry.get("last_success")
-                last_attempt_iso = entry.get("last_attempt")
-                last_status = entry.get("last_status")
-
-                ref_time = last_success_iso
-                if not rerun_onfail and last_status not in (None, 0):
-                    ref_time = last_attempt_iso or last_success_iso
-
-                if not is_due(ref_time, freq):
-                    if args.verbose:
-                        print(f"SKIP (not due): [{freq}] {cmd}")
-                    continue
-
-                # Check requirements (unknown names count as unmet). Each function takes one arg (cmd).
-                unmet = []
-                for r in (reqs or []):
-                    fn = REQUIREMENTS.get(r)
-                    ok = False
-                    if fn:
-                        try:
-                            ok = bool(fn(cmd))
-                        except Exception:
-                            ok = False
-                    if not fn or not ok:
-                        unmet.append(r)
-                if unmet:
-                    if args.verbose:
-                        print(f"SKIP (requirements not met: {unmet}): {cmd}")
-                    entry["last_note"] = f"skipped: unmet requirements {unmet}"
-                    continue
 
-                if task_id not in seen:
-                    seen.add(task_id)
-                    due.append((task_id, cmd, rerun_onfail))
+        for task_id, cmd, reqs, rerun_onfail in candidates:
+            unmet = [r for r in reqs if not req_results.get(r, False)]
+            if unmet:
+                if args.verbose:
+                    print(f"SKIP (requirements not met: {unmet}): {cmd}")
+                note = f"skipped: unmet requirements {unmet}"
+                entry = tasks_state[task_id]
+                if entry.last_note != note:  # same skip as last run: nothing to write
+                    entry.last_note = note
+                    state_dirty = True
+                continue
+
+            due.append((task_id, cmd, rerun_onfail))
 
         if args.verbose:
             print(f"Due tasks: {len(due)}")
 
         if not due:
-            if not args.dry_run:
+            if state_dirty and not args.dry_run:
                 save_state(state_path, state)
             sys.exit(0)
 
         due.sort(key=lambda item: item[2])  # launch non-rerun tasks first
 
+        # Before Python 3.12, asyncio parks one watcher thread per child, so keep a default cap
         max_workers = args.max_workers if args.max_workers > 0 else min(32, len(due))
 
-        # Workers only report; main thread mutates state
-        def _job(task_id: str, cmd: str, rerun_onfail: bool) -> Tuple[str, Union[int, str], str, Optional[str], bool, Optional[str]]:
-            started = iso(now_utc()) or ""
-            if rerun_onfail:
-                rc = run_command(cmd, verbose=args.verbose, dry_run=args.dry_run)
-                finished = iso(now_utc()) or ""
-                note = f"finished_at={finished}"
-                return (task_id, rc, started, finished, rerun_onfail, note)
+        # Jobs only report; the caller mutates state
+        def _launch(task_id: str, cmd: str, started: datetime) -> JobResult:
             if args.dry_run:
-                return (task_id, "?", started, None, rerun_onfail, "dry-run (not started)")
+                return (task_id, "?", started, None, False, "dry-run (not started)")
             proc = subprocess.Popen(cmd, shell=True, start_new_session=True)
             note = f"in-progress pid={proc.pid}"
-            return (task_id, "?", started, None, rerun_onfail, note)
+            return (task_id, "?", started, None, False, note)
+
+        def _job(task_id: str, cmd: str, rerun_onfail: bool) -> JobResult:
+            started = now_utc()
+            if rerun_onfail:
+                rc = run_command(cmd, verbose=args.verbose, dry_run=args.dry_run)
+                finished = now_utc()
+                note = f"finished_at={iso(finished)}"
+                return (task_id, rc, started, finished, rerun_onfail, note)
+            return _launch(task_id, cmd, started)
+
+        async def _job_async(task_id: str, cmd: str, rerun_onfail: bool) -> JobResult:
+            started = now_utc()
+            if rerun_onfail:
+                rc = await run_command_async(cmd, verbose=args.verbose, dry_run=args.dry_run)
+                finished = now_utc()
+                note = f"finished_at={iso(finished)}"
+                return (task_id, rc, started, finished, rerun_onfail, note)
+            return _launch(task_id, cmd, started)
 
-        results: List[Tuple[str, Union[int, str], str, Optional[str], bool, Optional[str]]] = []
-        with cf.ThreadPoolExecutor(max_workers=max_workers) as pool:
-            futures = [pool.submit(_job, tid, cmd, rerun_onfail) for (tid, cmd, rerun_onfail) in due]
-            for fut in cf.as_completed(futures):
-                results.append(fut.result())
+        async def _run_all() -> List[JobResult]:
+            # max_workers coroutines drain one shared iterator; results keep `due` order
+            results: List[Optional[JobResult]] = [None] * len(due)
+            pending = iter(enumerate(due))
+
+            async def _worker() -> None:
+                for i, (tid, cmd, rerun_onfail) in pending:
+                    results[i] = await _job_async(tid, cmd, rerun_onfail)
+
+            await asyncio.gather(*(_worker() for _ in range(min(max_workers, len(due)))))
+            return [r for r in results if r is not None]
+
+        if min(max_workers, len(due)) == 1 or not any(rerun_onfail for (_, _, rerun_onfail) in due):
+            # Nothing to overlap (one worker, or every job is a non-blocking launch): skip the event loop
+            results = [_job(tid, cmd, rerun_onfail) for (tid, cmd, rerun_onfail) in due]
+        else:
+            # One event loop drives all jobs (child waits may still use a watcher thread each)
+            import asyncio  # deferred: asyncio is the slowest import and most runs don't need it
+
+            results = asyncio.run(_run_all())
 
         # Apply results (no state writes on dry-run)
         exit_code = 0
         if not args.dry_run:
+            state_dirty = True
             for (task_id, rc, started, finished, rerun_onfail, note) in results:
+                # Each instant is formatted once and its epoch value taken directly: no re-parsing
                 e = tasks_state[task_id]
-                e["last_attempt"] = started
+                e.last_attempt, e.last_attempt_ts = iso(started), started.timestamp()
+                e.last_status = rc
+                e.last_note = note or ""
                 if isinstance(rc, int):
-                    e["last_status"] = rc
-                    e["last_note"] = note or ""
-                    if rc == 0:
-                        e["last_success"] = finished
-                    else:
-                        if exit_code == 0:
-                            exit_code = rc
+                    if rc == 0 and finished is not None:
+                        e.last_success, e.last_success_ts = iso(finished), finished.timestamp()
+                    elif rc != 0 and exit_code == 0:
+                        exit_code = rc
                     if args.verbose:
                         status_repr = "OK" if rc == 0 else f"FAIL({rc})"
-                        print(f"DONE [{e['frequency']}]: {e['cmd']} -> {status_repr}")
-                else:
-                    e["last_status"] = rc
-                    e["last_note"] = note or ""
-                    if args.verbose:
-                        print(f"LAUNCHED [{e['frequency']}]: {e['cmd']} -> {note}")
+                        print(f"DONE [{e.frequency}]: {e.cmd} -> {status_repr}")
+                elif args.verbose:
+                    print(f"LAUNCHED [{e.frequency}]: {e.cmd} -> {note}")
         else:
             if args.verbose:
                 for (task_id, rc, started, finished, _, note) in results:
                     e = tasks_state[task_id]
                     if isinstance(rc, int):
-                        print(f"DRY-RUN (would run) [{e['frequency']}]: {e['cmd']} (planned_start={started})")
+                        print(f"DRY-RUN (would run) [{e.frequency}]: {e.cmd} (planned_start={iso(started)})")
                     else:
-                        print(f"DRY-RUN (would launch) [{e['frequency']}]: {e['cmd']} (planned_start={started})")
+                        print(f"DRY-RUN (would launch) [{e.frequency}]: {e.cmd} (planned_start={iso(started)})")
 
-        if not args.dry_run:
+        if state_dirty and not args.dry_run:
             save_state(state_path, state)
         sys.exit(exit_code)
 
     finally:
-        release_lock(lock_path)
+        release_lock(lock_fd)
 
 if __name__ == "__main__":
     main()
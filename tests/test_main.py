@@ -1,4 +1,8 @@
+import asyncio
 import json
+import os
+import shutil
+import signal
 import subprocess
 import sys
 import textwrap
@@ -56,6 +60,88 @@ def test_load_yaml_warns_for_non_list_jobs(tmp_path, capsys):
     assert "expected a list" in err
 
 
+def test_iter_jobs_normalizes_job_forms(tmp_path):
+    cfg = write_config(
+        tmp_path,
+        """
+        daily:
+          - bash a.sh:
+              - Internet
+          - python a.py: internet
+          - ./just_run_me.sh
+          - ./also_okay:
+        weekly:
+          - ./cleanup_logs.sh: [internet, ac_power]
+        """,
+    )
+
+    assert list(napcron.iter_jobs(str(cfg))) == [
+        ("daily", "bash a.sh", ["internet"]),
+        ("daily", "python a.py", ["internet"]),
+        ("daily", "./just_run_me.sh", []),
+        ("daily", "./also_okay", []),
+        ("weekly", "./cleanup_logs.sh", ["internet", "ac_power"]),
+    ]
+
+
+def test_iter_jobs_without_libyaml(tmp_path, monkeypatch):
+    yaml = pytest.importorskip("yaml")
+    monkeypatch.delattr(yaml, "CSafeLoader", raising=False)
+    cfg = write_config(
+        tmp_path,
+        """
+        daily:
+          - echo ok: internet
+        """,
+    )
+
+    assert list(napcron.iter_jobs(str(cfg))) == [("daily", "echo ok", ["internet"])]
+
+
+def test_iter_jobs_drops_duplicate_tasks(tmp_path, capsys):
+    cfg = write_config(
+        tmp_path,
+        """
+        daily:
+          - echo twice
+          - echo twice: internet
+        Daily:
+          - echo twice
+        weekly:
+          - echo twice
+        """,
+    )
+
+    assert list(napcron.iter_jobs(str(cfg))) == [
+        ("daily", "echo twice", []),
+        ("weekly", "echo twice", []),
+    ]
+
+    err = capsys.readouterr().err
+    assert err.count("duplicate task 'echo twice' under 'daily'") == 2
+    assert "under 'weekly'" not in err
+
+
+def test_iter_jobs_warns_for_unknown_requirement(tmp_path, capsys):
+    cfg = write_config(
+        tmp_path,
+        """
+        daily:
+          - echo a: [internet, gpu]
+          - echo b: gpu
+          - echo c: rerun_onfail
+        """,
+    )
+
+    jobs = list(napcron.iter_jobs(str(cfg)))
+    assert jobs[0] == ("daily", "echo a", ["internet", "gpu"])
+
+    err = capsys.readouterr().err
+    assert err.count("unknown requirement 'gpu'") == 1
+    assert "rerun_onfail" not in err
+    assert "internet" not in err
+
+
 def run_main(monkeypatch, args):
     monkeypatch.setattr(sys, "argv", ["napcron.py", *args])
     with pytest.raises(SystemExit) as exc:
@@ -74,6 +160,7 @@ def test_run_command_suppresses_output(monkeypatch):
         called["stderr"] = stderr
         return DummyResult()
 
+    monkeypatch.setattr(napcron, "_USE_POSIX_SPAWN", False)
     monkeypatch.setattr(subprocess, "run", fake_run)
     rc = napcron.run_command("echo hi", verbose=False, dry_run=False)
     assert rc == 3
@@ -92,6 +179,7 @@ def test_run_command_passthrough_when_verbose(monkeypatch):
         called["stderr"] = stderr
         return DummyResult()
 
+    monkeypatch.setattr(napcron, "_USE_POSIX_SPAWN", False)
     monkeypatch.setattr(subprocess, "run", fake_run)
     rc = napcron.run_command("echo hi", verbose=True, dry_run=False)
     assert rc == 0
@@ -99,6 +187,113 @@ def test_run_command_passthrough_when_verbose(monkeypatch):
     assert called["stderr"] is None
 
 
+def test_run_command_execs_simple_commands_without_shell(monkeypatch):
+    calls = []
+
+    class DummyResult:
+        returncode = 0
+
+    def fake_run(cmd, shell, stdout, stderr):
+        calls.append((cmd, shell))
+        return DummyResult()
+
+    monkeypatch.setattr(napcron, "_USE_POSIX_SPAWN", False)
+    monkeypatch.setattr(subprocess, "run", fake_run)
+    napcron.run_command("./backup.sh --fast", verbose=False, dry_run=False)
+    napcron.run_command("echo $HOME > out.txt", verbose=False, dry_run=False)
+    assert calls == [
+        (["./backup.sh", "--fast"], False),
+        ("echo $HOME > out.txt", True),
+    ]
+
+
+def test_run_command_falls_back_to_shell_when_exec_fails(monkeypatch):
+    calls = []
+
+    class DummyResult:
+        returncode = 0
+
+    def fake_run(cmd, shell, stdout, stderr):
+        calls.append((cmd, shell))
+        if not shell:
+            raise FileNotFoundError(cmd[0])
+        return DummyResult()
+
+    monkeypatch.setattr(napcron, "_USE_POSIX_SPAWN", False)
+    monkeypatch.setattr(subprocess, "run", fake_run)
+    rc = napcron.run_command("source env.sh", verbose=False, dry_run=False)
+    assert rc == 0
+    assert calls == [(["source", "env.sh"], False), ("source env.sh", True)]
+
+
+@pytest.mark.skipif(not napcron._USE_POSIX_SPAWN, reason="posix_spawn not available")
+def test_run_command_posix_spawn_exit_codes_and_output(monkeypatch, capfd):
+    def fail_if_called(*_args, **_kwargs):
+        raise AssertionError("subprocess.run should not be used for shell-free commands")
+
+    monkeypatch.setattr(subprocess, "run", fail_if_called)
+    assert napcron.run_command(f"{sys.executable} -V", verbose=False, dry_run=False) == 0
+    assert capfd.readouterr().out == ""
+
+    assert napcron.run_command(f"{sys.executable} -V", verbose=True, dry_run=False) == 0
+    assert "Python" in capfd.readouterr().out
+
+    false = shutil.which("false")
+    if false:
+        assert napcron.run_command(false, verbose=False, dry_run=False) == 1
+
+
+@pytest.mark.skipif(not napcron._USE_POSIX_SPAWN, reason="posix_spawn not available")
+def test_run_command_posix_spawn_falls_back_to_shell():
+    assert napcron.run_command("exit 4", verbose=False, dry_run=False) == 4
+
+
+@pytest.mark.skipif(not napcron._USE_POSIX_SPAWN, reason="posix_spawn not available")
+def test_run_command_posix_spawn_never_reruns_when_child_is_auto_reaped(tmp_path):
+    counter = tmp_path / "count"
+    script = tmp_path / "inc.sh"
+    script.write_text(f"echo x >> {counter}\n")
+    previous = signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+    try:
+        rc = napcron.run_command(f"/usr/bin/env sh {script}", verbose=False, dry_run=False)
+    finally:
+        signal.signal(signal.SIGCHLD, previous)
+    assert rc == 0
+    assert counter.read_text().count("x") == 1
+
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/status"), reason="needs /proc")
+def test_run_command_posix_spawn_restores_default_signals(capfd):
+    napcron.run_command("grep SigIgn /proc/self/status", verbose=True, dry_run=False)
+    ignored = int(capfd.readouterr().out.split()[-1], 16)
+    for sig in (signal.SIGPIPE, signal.SIGXFSZ):
+        assert not ignored & (1 << (sig - 1)), sig
+
+
+@pytest.mark.skipif(not napcron._USE_POSIX_SPAWN, reason="posix_spawn not available")
+def test_run_command_posix_spawn_closes_inherited_fds(capfd):
+    r, w = os.pipe()
+    try:
+        os.set_inheritable(w, True)
+        napcron.run_command(f"ls {napcron._FD_DIR}", verbose=True, dry_run=False)
+        listed = {int(name) for name in capfd.readouterr().out.split() if name.isdigit()}
+    finally:
+        os.close(r)
+        os.close(w)
+    assert w not in listed
+    assert {0, 1, 2} <= listed
+
+
+def test_run_command_async_returns_exit_codes():
+    async def _run_both():
+        return await asyncio.gather(
+            napcron.run_command_async(f"{sys.executable} -V", verbose=False, dry_run=False),
+            napcron.run_command_async("exit 3", verbose=False, dry_run=False),
+        )
+
+    assert asyncio.run(_run_both()) == [0, 3]
+
+
 def test_main_uses_default_config_when_missing(tmp_path, monkeypatch):
     home = tmp_path / "home"
     home.mkdir()
@@ -200,6 +395,42 @@ def test_main_skips_task_when_not_due(tmp_path, monkeypatch):
     assert entry["last_success"] == recent  # unchanged
 
 
+def test_main_does_not_rewrite_unchanged_state(tmp_path, monkeypatch):
+    config = write_config(
+        tmp_path,
+        """
+        daily:
+          - echo later
+        """,
+    )
+    state = tmp_path / "state.json"
+    recent = napcron.iso(napcron.now_utc())
+    original = json.dumps(
+        {
+            "tasks": {
+                "daily::echo later": {
+                    "frequency": "daily",
+                    "cmd": "echo later",
+                    "last_success": recent,
+                    "last_attempt": recent,
+                    "last_status": 0,
+                    "last_note": "finished_at=recent",
+                }
+            }
+        }
+    )
+    state.write_text(original)
+
+    # The first run stores the parsed config; after that nothing changes
+    assert run_main(monkeypatch, [str(config), "--state", str(state)]) == 0
+    cached = state.read_text()
+    assert cached != original
+
+    exit_code = run_main(monkeypatch, [str(config), "--state", str(state)])
+    assert exit_code == 0
+    assert state.read_text() == cached
+
+
 def test_main_marks_unmet_requirements_and_skips(tmp_path, monkeypatch):
     config = write_config(
         tmp_path,
@@ -228,15 +459,106 @@ def test_main_marks_unmet_requirements_and_skips(tmp_path, monkeypatch):
     assert "unmet requirements" in entry["last_note"]
 
 
+def test_repeated_requirement_skip_does_not_rewrite_state(tmp_path, monkeypatch):
+    config = write_config(
+        tmp_path,
+        """
+        daily:
+          - guarded cmd: internet
+        """,
+    )
+    state = tmp_path / "state.json"
+    monkeypatch.setitem(napcron.REQUIREMENTS, "internet", lambda _: False)
+
+    assert run_main(monkeypatch, [str(config), "--state", str(state)]) == 0
+    first = state.read_text()
+    state.write_text(first.replace("\n", "\n "))  # detectable if rewritten
+
+    assert run_main(monkeypatch, [str(config), "--state", str(state)]) == 0
+    assert state.read_text() == first.replace("\n", "\n ")
+
+
+def test_requirements_evaluated_once_per_run(tmp_path, monkeypatch):
+    config = write_config(
+        tmp_path,
+        """
+        daily:
+          - guarded one: internet
+          - guarded two: internet
+        weekly:
+          - guarded three: [internet]
+        """,
+    )
+    state = tmp_path / "state.json"
+
+    calls = []
+
+    def fake_internet(cmd):
+        calls.append(cmd)
+        return False
+
+    monkeypatch.setitem(napcron.REQUIREMENTS, "internet", fake_internet)
+    exit_code = run_main(monkeypatch, [str(config), "--state", str(state)])
+    assert exit_code == 0
+    assert len(calls) == 1
+
+    saved = json.loads(state.read_text())
+    for task_id in ("daily::guarded one", "daily::guarded two", "weekly::guarded three"):
+        assert "unmet requirements" in saved["tasks"][task_id]["last_note"]
+
+
+def test_requirements_not_evaluated_for_tasks_not_due(tmp_path, monkeypatch):
+    config = write_config(
+        tmp_path,
+        """
+        daily:
+          - echo later: internet
+        """,
+    )
+    state = tmp_path / "state.json"
+    recent = napcron.iso(napcron.now_utc())
+    state.write_text(
+        json.dumps(
+            {
+                "tasks": {
+                    "daily::echo later": {
+                        "frequency": "daily",
+                        "cmd": "echo later",
+                        "last_success": recent,
+                        "last_attempt": recent,
+                        "last_status": 0,
+                        "last_note": "finished_at=recent",
+                    }
+                }
+            }
+        )
+    )
+
+    def fail_if_called(*_args, **_kwargs):
+        raise AssertionError("requirements should not be checked when no task is due")
+
+    monkeypatch.setitem(napcron.REQUIREMENTS, "internet", fail_if_called)
+    exit_code = run_main(monkeypatch, [str(config), "--state", str(state)])
+    assert exit_code == 0
+
+
 def test_is_due_respects_hourly_interval(monkeypatch):
     reference = datetime(2024, 1, 1, 12, 0, tzinfo=timezone.utc)
     monkeypatch.setattr(napcron, "now_utc", lambda: reference)
 
-    within_hour = napcron.iso(reference - timedelta(minutes=30))
+    within_hour = (reference - timedelta(minutes=30)).timestamp()
     assert not napcron.is_due(within_hour, "hourly")
 
-    older = napcron.iso(reference - timedelta(hours=2))
+    older = (reference - timedelta(hours=2)).timestamp()
     assert napcron.is_due(older, "hourly")
+    assert napcron.is_due(None, "hourly")
+
+    later = (reference + timedelta(hours=1)).timestamp()
+    assert napcron.is_due(within_hour, "hourly", now=later)
+
+    cutoffs = napcron.due_cutoffs(reference.timestamp())
+    assert cutoffs["hourly"] == (reference - timedelta(hours=1)).timestamp()
+    assert cutoffs["weekly"] == (reference - timedelta(days=7)).timestamp()
 
 
 def test_failed_task_waits_until_next_interval_without_flag(tmp_path, monkeypatch):
@@ -376,3 +698,327 @@ def test_custom_state_path_parent_created(tmp_path, monkeypatch):
     assert exit_code == 0
     assert popen_calls == [("echo with_state_dir", {"shell": True, "start_new_session": True})]
     assert state.exists()
+
+
+def test_main_runs_many_tasks_on_event_loop(tmp_path, monkeypatch):
+    config = write_config(
+        tmp_path,
+        """
+        daily:
+          - echo one: rerun_onfail
+          - echo two: rerun_onfail
+          - echo three: rerun_onfail
+        weekly:
+          - echo four: rerun_onfail
+          - echo five: rerun_onfail
+        """,
+    )
+    state = tmp_path / "state.json"
+
+    calls = []
+    running = {"now": 0, "peak": 0}
+
+    async def fake_run_async(cmd, verbose, dry_run):
+        calls.append(cmd)
+        running["now"] += 1
+        running["peak"] = max(running["peak"], running["now"])
+        await asyncio.sleep(0.01)
+        running["now"] -= 1
+        return 1 if cmd == "echo three" else 0
+
+    def fail_if_called(*_args, **_kwargs):
+        raise AssertionError("blocking run_command should not be used for concurrent tasks")
+
+    monkeypatch.setattr(napcron, "run_command", fail_if_called)
+    monkeypatch.setattr(napcron, "run_command_async", fake_run_async)
+    exit_code = run_main(monkeypatch, [str(config), "--state", str(state), "--max-workers", "2"])
+    assert exit_code == 1
+    assert sorted(calls) == sorted(["echo one", "echo two", "echo three", "echo four", "echo five"])
+    assert running["peak"] == 2
+
+    saved = json.loads(state.read_text())
+    statuses = {tid: e["last_status"] for tid, e in saved["tasks"].items()}
+    assert statuses == {
+        "daily::echo one": 0,
+        "daily::echo two": 0,
+        "daily::echo three": 1,
+        "weekly::echo four": 0,
+        "weekly::echo five": 0,
+    }
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_state_round_trip_uses_task_entries(tmp_path, monkeypatch, use_orjson):
+    if use_orjson:
+        pytest.importorskip("orjson")
+    else:
+        monkeypatch.setattr(napcron, "orjson", None)
+    path = tmp_path / "state.json"
+    entry = napcron.TaskEntry("daily", "echo hi", last_status=0, last_note="finished_at=now")
+    napcron.save_state(str(path), {"tasks": {"daily::echo hi": entry}})
+
+    raw = json.loads(path.read_text())
+    assert raw["tasks"]["daily::echo hi"] == {
+        "frequency": "daily",
+        "cmd": "echo hi",
+        "last_success": None,
+        "last_attempt": None,
+        "last_status": 0,
+        "last_note": "finished_at=now",
+        "last_success_ts": None,
+        "last_attempt_ts": None,
+    }
+
+    loaded = napcron.load_state(str(path))["tasks"]["daily::echo hi"]
+    assert isinstance(loaded, napcron.TaskEntry)
+    assert loaded.to_dict() == entry.to_dict()
+
+
+def test_task_entry_keeps_unknown_keys(tmp_path):
+    path = tmp_path / "state.json"
+    path.write_text(json.dumps({"tasks": {"daily::echo hi": {
+        "frequency": "daily", "cmd": "echo hi", "note": "added by hand", "future_field": [1, 2],
+    }}}))
+
+    state = napcron.load_state(str(path))
+    state["tasks"]["daily::echo hi"].last_status = 0
+    napcron.save_state(str(path), state)
+
+    saved = json.loads(path.read_text())["tasks"]["daily::echo hi"]
+    assert saved["note"] == "added by hand"
+    assert saved["future_field"] == [1, 2]
+    assert saved["last_status"] == 0
+
+
+def test_task_entry_migrates_iso_timestamps():
+    success = "2024-01-01T12:00:00+00:00"
+    entry = napcron.TaskEntry.from_dict({"frequency": "daily", "cmd": "echo hi", "last_success": success})
+    assert entry.last_success_ts == datetime(2024, 1, 1, 12, 0, tzinfo=timezone.utc).timestamp()
+    assert entry.last_attempt_ts is None
+
+
+@pytest.mark.parametrize("bad", ["oops", True, [1], {"x": 1}])
+def test_task_entry_rederives_corrupt_timestamps(bad):
+    success = "2024-01-01T12:00:00+00:00"
+    entry = napcron.TaskEntry.from_dict(
+        {"frequency": "daily", "cmd": "echo hi", "last_success": success,
+         "last_success_ts": bad, "last_attempt_ts": bad}
+    )
+    assert entry.last_success_ts == datetime(2024, 1, 1, 12, 0, tzinfo=timezone.utc).timestamp()
+    assert entry.last_attempt_ts is None
+
+
+def test_corrupt_timestamp_in_state_treats_task_as_due(tmp_path, monkeypatch):
+    config = write_config(tmp_path, "daily:\n  - echo hi: rerun_onfail\n")
+    state = tmp_path / "state.json"
+    state.write_text(json.dumps({"tasks": {"daily::echo hi": {
+        "frequency": "daily", "cmd": "echo hi", "last_success_ts": "oops",
+    }}}))
+    calls = []
+
+    def fake_run(cmd, verbose, dry_run):
+        calls.append(cmd)
+        return 0
+
+    monkeypatch.setattr(napcron, "run_command", fake_run)
+    assert run_main(monkeypatch, [str(config), "--state", str(state)]) == 0
+    assert calls == ["echo hi"]
+    assert isinstance(json.loads(state.read_text())["tasks"]["daily::echo hi"]["last_success_ts"], float)
+
+
+def test_single_worker_runs_inline_without_event_loop(tmp_path, monkeypatch):
+    config = write_config(
+        tmp_path,
+        """
+        daily:
+          - echo first: rerun_onfail
+          - echo second: rerun_onfail
+        """,
+    )
+    state = tmp_path / "state.json"
+
+    def fail_if_called(*_args, **_kwargs):
+        raise AssertionError("no event loop should be started for a single worker")
+
+    calls = []
+
+    def fake_run(cmd, verbose, dry_run):
+        calls.append(cmd)
+        return 0
+
+    monkeypatch.setattr(asyncio, "run", fail_if_called)
+    monkeypatch.setattr(napcron, "run_command", fake_run)
+    exit_code = run_main(monkeypatch, [str(config), "--state", str(state), "--max-workers", "1"])
+    assert exit_code == 0
+    assert calls == ["echo first", "echo second"]
+
+
+def test_launch_only_tasks_run_inline_without_event_loop(tmp_path, monkeypatch):
+    config = write_config(
+        tmp_path,
+        """
+        daily:
+          - echo first
+          - echo second
+        """,
+    )
+    state = tmp_path / "state.json"
+
+    def fail_if_called(*_args, **_kwargs):
+        raise AssertionError("no event loop should be started when no task waits on its command")
+
+    launched = []
+
+    class DummyPopen:
+        def __init__(self, cmd, **_kwargs):
+            launched.append(cmd)
+            self.pid = 4242
+
+    monkeypatch.setattr(asyncio, "run", fail_if_called)
+    monkeypatch.setattr(subprocess, "Popen", DummyPopen)
+    exit_code = run_main(monkeypatch, [str(config), "--state", str(state)])
+    assert exit_code == 0
+    assert launched == ["echo first", "echo second"]
+
+
+def test_lock_is_exclusive_until_released(tmp_path):
+    state = str(tmp_path / "state.json")
+
+    first = napcron.acquire_lock(state)
+    assert first is not None
+    try:
+        assert napcron.acquire_lock(state) is None
+    finally:
+        napcron.release_lock(first)
+
+    second = napcron.acquire_lock(state)
+    assert second is not None
+    napcron.release_lock(second)
+
+
+@pytest.mark.parametrize("extra_args, expected_peak", [([], 32), (["--max-workers", "40"], 40)])
+def test_concurrency_capped_by_default(tmp_path, monkeypatch, extra_args, expected_peak):
+    jobs = "\n".join(f"  - echo job{i}: rerun_onfail" for i in range(40))
+    config = tmp_path / "config.yaml"
+    config.write_text(f"daily:\n{jobs}\n")
+    state = tmp_path / "state.json"
+
+    running = {"now": 0, "peak": 0}
+
+    async def fake_run_async(cmd, verbose, dry_run):
+        running["now"] += 1
+        running["peak"] = max(running["peak"], running["now"])
+        await asyncio.sleep(0.01)
+        running["now"] -= 1
+        return 0
+
+    monkeypatch.setattr(napcron, "run_command_async", fake_run_async)
+    exit_code = run_main(monkeypatch, [str(config), "--state", str(state), *extra_args])
+    assert exit_code == 0
+    assert running["peak"] == expected_peak
+
+
+def test_config_cache_skips_parsing_until_config_changes(tmp_path, monkeypatch):
+    config = write_config(
+        tmp_path,
+        """
+        daily:
+          - echo cached
+        """,
+    )
+    state = tmp_path / "state.json"
+
+    class DummyProc:
+        pid = 4242
+
+    monkeypatch.setattr(napcron.subprocess, "Popen", lambda cmd, **kwargs: DummyProc())
+
+    assert run_main(monkeypatch, [str(config), "--state", str(state), "--max-workers", "1"]) == 0
+    saved = json.loads(state.read_text())
+    assert saved[napcron.CONFIG_CACHE_KEY]["jobs"] == [["daily", "echo cached", []]]
+
+    real_iter_jobs = napcron.iter_jobs
+
+    def fail_if_called(*_args, **_kwargs):
+        raise AssertionError("unchanged config should not be parsed again")
+
+    monkeypatch.setattr(napcron, "iter_jobs", fail_if_called)
+    assert run_main(monkeypatch, [str(config), "--state", str(state)]) == 0
+
+    config.write_text("weekly:\n  - echo changed\n")
+    monkeypatch.setattr(napcron, "iter_jobs", real_iter_jobs)
+    assert run_main(monkeypatch, [str(config), "--state", str(state), "--max-workers", "1"]) == 0
+    saved = json.loads(state.read_text())
+    assert saved[napcron.CONFIG_CACHE_KEY]["jobs"] == [["weekly", "echo changed", []]]
+    assert "weekly::echo changed" in saved["tasks"]
+
+
+def test_config_cache_replays_parse_warnings(tmp_path, monkeypatch, capsys):
+    config = write_config(
+        tmp_path,
+        """
+        daily:
+          - echo hi: internt
+          - echo hi
+          - echo hi
+        yearly:
+          - echo never
+        """,
+    )
+    state = tmp_path / "state.json"
+
+    class DummyProc:
+        pid = 4242
+
+    monkeypatch.setattr(napcron.subprocess, "Popen", lambda cmd, **kwargs: DummyProc())
+
+    run_main(monkeypatch, [str(config), "--state", str(state)])
+    first = capsys.readouterr().err
+    assert "unknown requirement 'internt'" in first
+    assert "duplicate task 'echo hi'" in first
+    assert "unsupported frequency 'yearly'" in first
+
+    def fail_if_called(*_args, **_kwargs):
+        raise AssertionError("unchanged config should not be parsed again")
+
+    monkeypatch.setattr(napcron, "iter_jobs", fail_if_called)
+    run_main(monkeypatch, [str(config), "--state", str(state)])
+    assert sorted(capsys.readouterr().err.splitlines()) == sorted(first.splitlines())
+
+
+def test_config_cache_rechecks_requirements_registered_later(tmp_path, monkeypatch, capsys):
+    config = write_config(tmp_path, "daily:\n  - echo train: gpu\n")
+    state = tmp_path / "state.json"
+    calls = []
+
+    class DummyProc:
+        pid = 4242
+
+    def fake_popen(cmd, **_kwargs):
+        calls.append(cmd)
+        return DummyProc()
+
+    monkeypatch.setattr(napcron.subprocess, "Popen", fake_popen)
+    run_main(monkeypatch, [str(config), "--state", str(state)])
+    assert "unknown requirement 'gpu'" in capsys.readouterr().err
+    assert calls == []
+
+    monkeypatch.setitem(napcron.REQUIREMENTS, "gpu", lambda _cmd: True)
+    run_main(monkeypatch, [str(config), "--state", str(state)])
+    assert "unknown requirement" not in capsys.readouterr().err
+    assert calls == ["echo train"]
+
+
+@pytest.mark.parametrize(
+    "bad_jobs",
+    [[["daily", "echo hi"]], [["yearly", "echo hi", []]], [["daily", "echo hi", "internet"]], "junk"],
+)
+def test_config_cache_reparses_malformed_entry(tmp_path, monkeypatch, bad_jobs):
+    config = write_config(tmp_path, "daily:\n  - echo hi\n")
+    state = {}
+    jobs, updated = napcron.load_jobs(str(config), state)
+    assert updated and jobs == [("daily", "echo hi", [])]
+
+    state[napcron.CONFIG_CACHE_KEY]["jobs"] = bad_jobs
+    jobs, updated = napcron.load_jobs(str(config), state)
+    assert updated and jobs == [("daily", "echo hi", [])]
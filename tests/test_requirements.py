@@ -1,10 +1,20 @@
+import os
+import socket
+import subprocess
 import sys
+import threading
+import time
 
 import pytest
 
 import napcron
 
 
+@pytest.fixture(autouse=True)
+def fresh_ac_cache(monkeypatch):
+    monkeypatch.setattr(napcron, "_AC_CACHE", {})
+
+
 @pytest.mark.parametrize(
     "platform, helper_name, helper_value, expected",
     [
@@ -63,3 +73,161 @@ def test_req_battery(monkeypatch, platform, helper_name, helper_value, expected)
     assert napcron.req_battery("noop") is expected
     if helper_name:
         assert called["count"] == 1
+
+
+def test_check_requirements_runs_checks_concurrently(monkeypatch):
+    barrier = threading.Barrier(2, timeout=5)
+
+    def _waits_for_peer(_cmd):
+        barrier.wait()  # raises BrokenBarrierError unless both checks run at once
+        return True
+
+    monkeypatch.setitem(napcron.REQUIREMENTS, "first", _waits_for_peer)
+    monkeypatch.setitem(napcron.REQUIREMENTS, "second", _waits_for_peer)
+
+    results = napcron.check_requirements({"first": "a", "second": "b", "unknown": "c"})
+    assert results == {"first": True, "second": True, "unknown": False}
+
+
+def test_check_requirements_times_out_hung_checks(monkeypatch):
+    release = threading.Event()
+
+    def _hangs(_cmd):
+        release.wait(5)
+        return True
+
+    monkeypatch.setitem(napcron.REQUIREMENTS, "hangs", _hangs)
+    monkeypatch.setitem(napcron.REQUIREMENTS, "fast", lambda _cmd: True)
+    try:
+        results = napcron.check_requirements({"hangs": "a", "fast": "b"}, timeout=0.05)
+    finally:
+        release.set()
+    assert results == {"hangs": False, "fast": True}
+
+
+def test_hung_check_does_not_delay_process_exit():
+    script = (
+        "import time, napcron\n"
+        "napcron.REQUIREMENTS['hangs'] = lambda _cmd: time.sleep(30)\n"
+        "print(napcron.check_requirements({'hangs': 'a'}, timeout=0.1))\n"
+    )
+    root = os.path.dirname(os.path.dirname(os.path.abspath(napcron.__file__)))
+    start = time.monotonic()
+    proc = subprocess.run(
+        [sys.executable, "-c", script], cwd=root, capture_output=True, text=True, timeout=20
+    )
+    assert proc.returncode == 0, proc.stderr
+    assert proc.stdout.strip() == "{'hangs': False}"
+    assert time.monotonic() - start < 10
+
+
+def test_req_internet_succeeds_if_any_target_accepts(monkeypatch):
+    closed = socket.socket()
+    closed.bind(("127.0.0.1", 0))
+    closed_port = closed.getsockname()[1]
+    closed.close()
+
+    with socket.socket() as server:
+        server.bind(("127.0.0.1", 0))
+        server.listen(1)
+        open_port = server.getsockname()[1]
+
+        monkeypatch.setattr(napcron, "INTERNET_TARGETS", [("127.0.0.1", closed_port), ("127.0.0.1", open_port)])
+        assert napcron.req_internet("noop") is True
+
+
+def test_req_internet_fails_when_no_target_accepts(monkeypatch):
+    closed = socket.socket()
+    closed.bind(("127.0.0.1", 0))
+    closed_port = closed.getsockname()[1]
+    closed.close()
+
+    monkeypatch.setattr(napcron, "INTERNET_TARGETS", [("127.0.0.1", closed_port)])
+    assert napcron.req_internet("noop") is False
+
+
+def _write_supply(base, name, **files):
+    supply = base / name
+    supply.mkdir(parents=True)
+    for fname, value in files.items():
+        (supply / fname).write_text(f"{value}\n")
+    return supply
+
+
+@pytest.fixture
+def fake_power_supply(tmp_path, monkeypatch):
+    base = tmp_path / "power_supply"
+    base.mkdir()
+    monkeypatch.setattr(napcron, "POWER_SUPPLY_DIR", str(base))
+    monkeypatch.setattr(napcron, "_AC_MAINS_ONLINE_PATH", None)
+    return base
+
+
+def test_linux_ac_online_caches_mains_path(fake_power_supply, monkeypatch):
+    _write_supply(fake_power_supply, "BAT0", type="Battery", status="Discharging")
+    ac = _write_supply(fake_power_supply, "AC", type="Mains", online=1)
+
+    assert napcron._linux_ac_online() is True
+
+    def fail_if_called(*_args, **_kwargs):
+        raise AssertionError("power supplies should not be rescanned")
+
+    monkeypatch.setattr(napcron.os, "scandir", fail_if_called)
+    (ac / "online").write_text("0\n")
+    assert napcron._linux_ac_online() is False
+
+
+def test_linux_ac_online_falls_back_to_battery_status(fake_power_supply):
+    _write_supply(fake_power_supply, "BAT0", type="Battery", status="Charging")
+    assert napcron._linux_ac_online() is True
+
+
+def test_linux_ac_online_prefers_mains_over_battery_status(fake_power_supply):
+    _write_supply(fake_power_supply, "BAT0", type="Battery", status="Full")
+    _write_supply(fake_power_supply, "AC", type="Mains", online=0)
+    assert napcron._linux_ac_online() is False
+
+
+def test_linux_ac_online_unknown_without_power_supplies(fake_power_supply):
+    assert napcron._linux_ac_online() is None
+    fake_power_supply.rmdir()
+    assert napcron._linux_ac_online() is None
+
+
+@pytest.mark.parametrize(
+    "source, expected",
+    [("AC Power", True), ("Battery Power", False), ("UPS Power", None)],
+)
+def test_macos_ac_online_uses_iokit(monkeypatch, source, expected):
+    def fail_if_called(*_args, **_kwargs):
+        raise AssertionError("pmset should not be spawned when IOKit answers")
+
+    monkeypatch.setattr(napcron, "_macos_power_source_type", lambda: source)
+    monkeypatch.setattr(napcron.subprocess, "check_output", fail_if_called)
+    assert napcron._macos_ac_online() is expected
+
+
+def test_macos_ac_online_falls_back_to_pmset(monkeypatch):
+    def _no_iokit():
+        raise OSError("IOKit not available")
+
+    def _fake_pmset(*_args, **_kwargs):
+        return "Now drawing from 'Battery Power'\n -InternalBattery-0 80%; discharging\n"
+
+    monkeypatch.setattr(napcron, "_macos_power_source_type", _no_iokit)
+    monkeypatch.setattr(napcron.subprocess, "check_output", _fake_pmset)
+    assert napcron._macos_ac_online() is False
+
+
+def test_ac_power_and_battery_share_one_probe(monkeypatch):
+    monkeypatch.setattr(sys, "platform", "linux")
+    calls = []
+
+    def _fake_helper():
+        calls.append(1)
+        return False
+
+    monkeypatch.setattr(napcron, "_linux_ac_online", _fake_helper)
+    results = napcron.check_requirements({"ac_power": "a", "battery": "b"})
+    assert results == {"ac_power": False, "battery": True}
+    assert len(calls) == 1